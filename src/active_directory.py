@@ -1,5 +1,40 @@
+import functools
+import logging
 import os
-from ldap3 import Server, Connection, ALL, MODIFY_REPLACE, SUBTREE
+import ssl
+from ldap3 import Server, ServerPool, Connection, Tls, BASE, FIRST, NONE, REUSABLE, MODIFY_ADD, MODIFY_REPLACE, SUBTREE
+from ldap3.utils.conv import escape_filter_chars
+from ldap3.utils.dn import escape_rdn
+
+logger = logging.getLogger(__name__)
+
+# One TLS configuration shared by every pooled connection. ldap3 builds a
+# fresh ssl context each time a socket is wrapped, so this shares settings,
+# not a session cache; avoiding repeat handshakes is the job of the
+# connection pool, which keeps sessions bound for their whole lifetime.
+# validate stays CERT_NONE (ldap3's default for ldaps) because the demo
+# domain controllers present self-signed certificates.
+_TLS_CONFIGURATION = Tls(validate=ssl.CERT_NONE, version=ssl.PROTOCOL_TLS)
+
+# Attribute lists reused across searches instead of being rebuilt per call
+_DN_ATTRIBUTES = ['distinguishedName']
+_DEFAULT_SEARCH_ATTRIBUTES = ['cn', 'distinguishedName', 'sAMAccountName']
+
+# AD tree-delete control; lets one delete operation remove an object
+# together with all of its children
+_TREE_DELETE_CONTROL = ('1.2.840.113556.1.4.805', False, None)
+
+# userAccountControl values: NORMAL_ACCOUNT, and NORMAL_ACCOUNT | ACCOUNTDISABLE
+_UAC_ENABLED_USER = 512
+_UAC_DISABLED_USER = 544
+
+def _scalar(value):
+    """Collapse a single-element attribute value list to its scalar.
+
+    Raw search responses keep every attribute as a list, and with
+    get_info=NONE there is no schema to collapse single-valued attributes.
+    """
+    return value[0] if isinstance(value, list) and len(value) == 1 else value
 
 class ActiveDirectory:
     """Encapsulates Active Directory operations for managing users and groups."""
@@ -7,6 +42,8 @@ class ActiveDirectory:
     def __init__(self):
         """Initialize connection to Active Directory."""
         self.default_password = "password"  # Ensure password meets complexity
+        # unicodePwd expects the quoted password in UTF-16LE; encode it once
+        self._encoded_password = ('"%s"' % self.default_password).encode("utf-16-le")
 
         # Domain details from ENV variables
         self.domain_name = os.getenv('AD_DOMAIN_NAME', '')
@@ -27,142 +64,304 @@ class ActiveDirectory:
         # Base DN
         self.base_dn = f'dc={self.domain_name},dc={self.domain_suffix}'
 
-        # Connect to AD
-        self.server = Server(self.ad_server, get_info=ALL)
-        self.conn = Connection(self.server, user=self.admin_dn, password=self.admin_password, auto_bind=True)
+        # DN builders memoized per name, so escaping and assembly happen once
+        # per distinct object
+        self.group_dn = functools.lru_cache(maxsize=None)(self._build_group_dn)
+        self.user_dn = functools.lru_cache(maxsize=None)(self._build_user_dn)
+
+        # Connect to AD through a pool of persistent connections; the reusable
+        # strategy keeps the LDAPS sessions bound across operations and still
+        # lets independent operations be issued back to back and drained together
+        # get_info=NONE skips the schema and DSA info download on bind
+        self.server = ServerPool([Server(self.ad_server, get_info=NONE, use_ssl=True, tls=_TLS_CONFIGURATION)],
+                                 pool_strategy=FIRST, active=True, exhaust=False)
+        self.conn = Connection(self.server, user=self.admin_dn, password=self.admin_password,
+                               client_strategy=REUSABLE, pool_name='ad', pool_size=5,
+                               pool_lifetime=600, auto_bind=True)
+
+        # Lower-cased DNs known to exist, to avoid repeating existence searches
+        self._dn_cache = set()
+
+        # Dedicated synchronous connection for paged searches, created lazily
+        self._paged_conn = None
+
+    def _paged_connection(self):
+        """Return the dedicated synchronous connection for paged searches.
+
+        Paged-results cookies are per-connection state, so every page of a
+        search must travel over the same bound connection; the reusable pool
+        dispatches each operation to whichever worker is free, which would
+        hand page-2 cookies to a connection that never saw page 1.
+        """
+        if self._paged_conn is None:
+            self._paged_conn = Connection(self.server, user=self.admin_dn, password=self.admin_password,
+                                          auto_bind=True)
+        return self._paged_conn
+
+    def _build_group_dn(self, name):
+        """Build the DN of a group in the Groups OU."""
+        return f'CN={escape_rdn(name)},OU=Groups,{self.base_dn}'
+
+    def _build_user_dn(self, name):
+        """Build the DN of a user in the Users container."""
+        return f'CN={escape_rdn(name)},CN=Users,{self.base_dn}'
+
+    def _result(self, message_id):
+        """Wait for an issued operation and return its result."""
+        _, result = self.conn.get_response(message_id)
+        return result
+
+    def _search_entries(self, message_id):
+        """Wait for an issued search and return its entries."""
+        response, _ = self.conn.get_response(message_id)
+        return response or []
+
+    def wait_all(self, message_ids):
+        """Drain the responses of concurrently issued operations, in order."""
+        return [self._result(message_id) for message_id in message_ids]
 
     def ensure_ou_exists(self, ou_name):
         """Ensure an Organizational Unit exists in Active Directory."""
-        ou_dn = f'OU={ou_name},{self.base_dn}'
-        cn_dn = f'CN={ou_name},{self.base_dn}'
+        ou_dn = f'OU={escape_rdn(ou_name)},{self.base_dn}'
+        cn_dn = f'CN={escape_rdn(ou_name)},{self.base_dn}'
 
-        self.conn.search(self.base_dn, f'(|(distinguishedName={ou_dn})(distinguishedName={cn_dn}))', attributes=['distinguishedName'])
-
-        if self.conn.entries:
-            print(f"'{ou_name}' already exists in Active Directory. Skipping creation.")
+        if self.existing_dns([ou_dn, cn_dn]):
+            logger.debug("'%s' already exists in Active Directory. Skipping creation.", ou_name)
             return
 
-        print(f"Creating Organizational Unit: {ou_name}")
-        self.conn.add(ou_dn, 'organizationalUnit')
+        logger.debug("Creating Organizational Unit: %s", ou_name)
+        result = self._result(self.conn.add(ou_dn, 'organizationalUnit'))
 
-        if self.conn.result['description'] == 'success':
-            print(f"Organizational Unit '{ou_name}' created successfully.")
+        if result['description'] == 'success':
+            self._dn_cache.add(ou_dn.lower())
+            logger.debug("Organizational Unit '%s' created successfully.", ou_name)
         else:
-            print(f"Failed to create Organizational Unit '{ou_name}':", self.conn.result)
+            logger.error("Failed to create Organizational Unit '%s': %s", ou_name, result)
+
+    def existing_dns(self, dns):
+        """Check which of the given DNs exist, using base-object reads.
+
+        A base-scoped read of each DN is an indexed lookup on the server,
+        unlike a subtree filter scan; the reads are issued concurrently and
+        drained together.
+
+        Args:
+            dns (list): Distinguished names to look up.
+
+        Returns:
+            set: The lower-cased DNs that exist in Active Directory.
+        """
+        found = set(dn.lower() for dn in dns if dn.lower() in self._dn_cache)
+        missing = [dn for dn in dns if dn.lower() not in found]
+        if not missing:
+            return found
+
+        pending = [(dn, self.conn.search(dn, '(objectClass=*)', search_scope=BASE,
+                                         attributes=_DN_ATTRIBUTES))
+                   for dn in missing]
+
+        hits = set(dn.lower() for dn, message_id in pending if self._search_entries(message_id))
+
+        self._dn_cache |= hits
+        return found | hits
 
     def create_group(self, name, gid, description=''):
         """Create an AD group if it doesn't exist."""
-        group_dn = f'CN={name},OU=Groups,{self.base_dn}'
-
-        self.conn.search(self.base_dn, f'(distinguishedName={group_dn})', attributes=['distinguishedName'])
-        if self.conn.entries:
-            print(f"Group '{name}' already exists. Skipping creation.")
-            return
+        self.create_groups([(name, gid, description)])
 
-        attributes = {'cn': name, 'sAMAccountName': name, 'description': description, 'gidNumber': str(gid)}
-        self.conn.add(group_dn, 'group', attributes)
+    def create_groups(self, groups):
+        """Create several AD groups, issuing the adds concurrently.
 
-        if self.conn.result['description'] == 'success':
-            print(f"Group '{name}' created successfully.")
-        else:
-            print(f"Failed to create group '{name}':", self.conn.result)
+        Args:
+            groups (list): Tuples of (name, gid, description) to create.
+        """
+        found = self.existing_dns([self.group_dn(name) for name, _, _ in groups])
+
+        pending = []
+        for name, gid, description in groups:
+            group_dn = self.group_dn(name)
+            if group_dn.lower() in found:
+                logger.debug("Group '%s' already exists. Skipping creation.", name)
+                continue
+
+            attributes = {'cn': name, 'sAMAccountName': name, 'description': description, 'gidNumber': str(gid)}
+            pending.append((self.conn.add(group_dn, 'group', attributes), name, group_dn))
+
+        for message_id, name, group_dn in pending:
+            result = self._result(message_id)
+            if result['description'] == 'success':
+                self._dn_cache.add(group_dn.lower())
+                logger.debug("Group '%s' created successfully.", name)
+            else:
+                logger.error("Failed to create group '%s': %s", name, result)
 
     def create_user(self, name, uid, description=''):
-        """Create an AD user and set a password separately."""
-        user_dn = f'CN={name},CN=Users,{self.base_dn}'
-        user_principal_name = f"{name}@{self.domain_name}.{self.domain_suffix}"
+        """Create an AD user with its password and enabled account in one add."""
+        self.create_users([(name, uid, description)])
 
-        self.conn.search(self.base_dn, f'(distinguishedName={user_dn})', attributes=['distinguishedName'])
-        if self.conn.entries:
-            print(f"User '{name}' already exists. Skipping creation.")
-            return
+    def create_users(self, users):
+        """Create several AD users, issuing the adds concurrently.
 
-        attributes = {
+        Args:
+            users (list): Tuples of (name, uid, description) to create.
+        """
+        found = self.existing_dns([self.user_dn(name) for name, _, _ in users])
+
+        pending = []
+        for name, uid, description in users:
+            user_dn = self.user_dn(name)
+            if user_dn.lower() in found:
+                logger.debug("User '%s' already exists. Skipping creation.", name)
+                continue
+
+            # Setting unicodePwd and userAccountControl at creation time saves two round-trips
+            attributes = self._user_attributes(name, uid)
+            attributes['unicodePwd'] = self._encoded_password  # Requires LDAPS
+            attributes['userAccountControl'] = _UAC_ENABLED_USER
+
+            message_id = self.conn.add(user_dn, ['top', 'person', 'organizationalPerson', 'user'], attributes)
+            pending.append((message_id, name, uid, user_dn))
+
+        for message_id, name, uid, user_dn in pending:
+            result = self._result(message_id)
+            if result['description'] == 'success':
+                self._dn_cache.add(user_dn.lower())
+                logger.debug("User '%s' created and enabled successfully.", name)
+            else:
+                # Fall back to the three-step sequence in case the server rejects the combined add
+                self._create_user_fallback(name, uid, user_dn)
+
+    def _user_attributes(self, name, uid):
+        """Build the common attribute set for a new user."""
+        return {
             'cn': name,
             'sAMAccountName': name,
-            'userPrincipalName': user_principal_name,
+            'userPrincipalName': f"{name}@{self.domain_name}.{self.domain_suffix}",
             'givenName': name,
             'sn': 'User',
             'displayName': name,
             'mail': f'{name}@{self.dns_suffix}',
             'gidNumber': str(uid),
-            'userAccountControl': 544  # Disabled User
         }
 
-        self.conn.add(user_dn, ['top', 'person', 'organizationalPerson', 'user'], attributes)
-        if self.conn.result['description'] != 'success':
-            print(f"Failed to create user '{name}':", self.conn.result)
+    def _create_user_fallback(self, name, uid, user_dn):
+        """Create a user with the three-step add, set password, enable sequence."""
+        attributes = self._user_attributes(name, uid)
+        attributes['userAccountControl'] = _UAC_DISABLED_USER
+
+        result = self._result(self.conn.add(user_dn, ['top', 'person', 'organizationalPerson', 'user'], attributes))
+        if result['description'] != 'success':
+            logger.error("Failed to create user '%s': %s", name, result)
             return
 
-        print(f"User '{name}' created successfully.")
+        self._dn_cache.add(user_dn.lower())
+        logger.debug("User '%s' created successfully.", name)
 
         # Set password
-        encoded_password = ('"%s"' % self.default_password).encode("utf-16-le")
-        self.conn.modify(user_dn, {'unicodePwd': [(MODIFY_REPLACE, [encoded_password])]})
+        result = self._result(self.conn.modify(user_dn, {'unicodePwd': [(MODIFY_REPLACE, [self._encoded_password])]}))
 
-        if self.conn.result['description'] != 'success':
-            print(f"Failed to set password for '{name}':", self.conn.result)
+        if result['description'] != 'success':
+            logger.error("Failed to set password for '%s': %s", name, result)
             return
 
-        print(f"Password set successfully for user '{name}'.")
+        logger.debug("Password set successfully for user '%s'.", name)
 
         # Enable account
-        self.conn.modify(user_dn, {'userAccountControl': [(MODIFY_REPLACE, [512])]})
-        print(f"User '{name}' enabled successfully.")
+        self._result(self.conn.modify(user_dn, {'userAccountControl': [(MODIFY_REPLACE, [_UAC_ENABLED_USER])]}))
+        logger.debug("User '%s' enabled successfully.", name)
 
     def add_user_to_group(self, group_name, user_name):
         """Add a user to a group, ensuring both exist."""
-        group_dn = f'CN={group_name},OU=Groups,{self.base_dn}'
-        user_dn = f'CN={user_name},CN=Users,{self.base_dn}'
+        group_dn = self.group_dn(group_name)
+        user_dn = self.user_dn(user_name)
 
-        self.conn.search(self.base_dn, f'(distinguishedName={group_dn})', attributes=['distinguishedName'])
-        if not self.conn.entries:
-            print(f"Group '{group_name}' not found. Skipping.")
+        found = self.existing_dns([group_dn, user_dn])
+        if group_dn.lower() not in found:
+            logger.debug("Group '%s' not found. Skipping.", group_name)
             return
 
-        self.conn.search(self.base_dn, f'(distinguishedName={user_dn})', attributes=['distinguishedName'])
-        if not self.conn.entries:
-            print(f"User '{user_name}' not found. Skipping.")
+        if user_dn.lower() not in found:
+            logger.debug("User '%s' not found. Skipping.", user_name)
             return
 
-        self.conn.modify(group_dn, {'member': [(MODIFY_REPLACE, [user_dn])]})
-        print(f"User '{user_name}' added to group '{group_name}'.")
+        result = self._result(self.conn.modify(group_dn, {'member': [(MODIFY_ADD, [user_dn])]}))
+
+        if result['description'] == 'entryAlreadyExists':
+            logger.debug("User '%s' is already a member of group '%s'. Skipping.", user_name, group_name)
+        elif result['description'] != 'success':
+            logger.error("Failed to add user '%s' to group '%s': %s", user_name, group_name, result)
+        else:
+            logger.debug("User '%s' added to group '%s'.", user_name, group_name)
 
-    def delete_object(self, dn, object_type):
+    def delete_object(self, dn, object_type, subtree=False):
         """Delete an AD object if it exists."""
-        self.conn.search(self.base_dn, f'(distinguishedName={dn})', attributes=['distinguishedName'])
-        if not self.conn.entries:
-            print(f"{object_type} '{dn}' not found. Skipping deletion.")
-            return
+        self.delete_objects([(dn, object_type)], subtree=subtree)
+
+    def delete_objects(self, objects, subtree=False):
+        """Delete several AD objects, issuing the deletes concurrently.
 
-        self.conn.delete(dn)
-        print(f"{object_type} '{dn}' deleted successfully.")
+        No existence check is made beforehand; a delete of a missing object
+        comes back as noSuchObject and is treated as already gone. With
+        subtree=True the tree-delete control is attached, so each object is
+        removed together with all of its children in a single operation.
 
-    def search_objects(self, object_class="*", search_filter="*", attributes=None):
+        Args:
+            objects (list): Tuples of (dn, object_type) to delete.
+            subtree (bool): Delete each object's whole subtree.
+        """
+        controls = [_TREE_DELETE_CONTROL] if subtree else None
+        pending = [(self.conn.delete(dn, controls=controls), dn, object_type) for dn, object_type in objects]
+
+        for message_id, dn, object_type in pending:
+            result = self._result(message_id)
+            if result['description'] == 'success':
+                self._dn_cache.discard(dn.lower())
+                logger.debug("%s '%s' deleted successfully.", object_type, dn)
+            elif result['description'] == 'noSuchObject':
+                self._dn_cache.discard(dn.lower())
+                logger.debug("%s '%s' not found. Skipping deletion.", object_type, dn)
+            else:
+                logger.error("Failed to delete %s '%s': %s", object_type, dn, result)
+
+    def search_objects(self, object_class="*", search_filter="*", attributes=None, paged_size=500):
         """Search for objects in Active Directory.
 
+        The search uses the simple paged results control, so large result sets
+        are streamed in pages instead of materialized in one response.
+
         Args:
             object_class (str): The AD object type to search (e.g., "user", "group", "*").
             search_filter (str): Custom LDAP search filter (default: "*").
             attributes (list): List of attributes to retrieve.
+            paged_size (int): Number of entries per page.
 
         Returns:
             list: A list of dictionaries containing the search results.
         """
         if attributes is None:
-            attributes = ['cn', 'distinguishedName', 'sAMAccountName']
+            attributes = _DEFAULT_SEARCH_ATTRIBUTES
 
-        ldap_filter = f"(&(objectClass={object_class}){search_filter})"
-        self.conn.search(self.base_dn, ldap_filter, search_scope=SUBTREE, attributes=attributes)
+        escaped_class = object_class if object_class == "*" else escape_filter_chars(object_class)
+        ldap_filter = f"(&(objectClass={escaped_class}){search_filter})"
+        conn = self._paged_connection()
+        entries = conn.extend.standard.paged_search(self.base_dn, ldap_filter, search_scope=SUBTREE,
+                                                    attributes=attributes, paged_size=paged_size,
+                                                    generator=True)
 
         results = []
-        for entry in self.conn.entries:
-            entry_dict = {attr: entry[attr].value for attr in attributes if attr in entry}
+        for entry in entries:
+            if entry.get('type') != 'searchResEntry':
+                continue
+            entry_attributes = entry.get('attributes', {})
+            entry_dict = {attr: _scalar(entry_attributes[attr]) for attr in attributes if attr in entry_attributes}
             results.append(entry_dict)
 
         return results
 
     def close(self):
-        """Close the AD connection."""
+        """Close the AD connections."""
+        if self._paged_conn is not None:
+            self._paged_conn.unbind()
+            self._paged_conn = None
         self.conn.unbind()
-        print("AD connection closed.")
\ No newline at end of file
+        logger.debug("AD connection closed.")
@@ -383,6 +383,11 @@ class FlashArray:
         r = self._client.delete_directory_exports(export_names=[export_name], policy_names=[policy_name])
         return handle_response(r)
 
+    def delete_exports(self, export_names, policy_names):
+        """Delete several directory exports with a single call"""
+        r = self._client.delete_directory_exports(export_names=export_names, policy_names=policy_names)
+        return handle_response(r)
+
     def get_managed_directory_policies_smb(self, managed_directory_name=None, managed_directory_id=None,
                                            member_type=None):
         r = self._client.get_policies_smb_members(
@@ -1,32 +1,53 @@
-import socket
-import socks
+import logging
+import os
 
 from active_directory import ActiveDirectory
 
+logger = logging.getLogger(__name__)
+
+_ad = None
+
+def get_ad():
+    """Return the process-wide ActiveDirectory instance, binding only once."""
+    global _ad
+    if _ad is None:
+        _ad = ActiveDirectory()
+    return _ad
+
 if __name__ == "__main__":
-    # Setup SOCKS5 proxy
-    socks.setdefaultproxy(socks.PROXY_TYPE_SOCKS5, 'localhost', 1080)
-    socket.socket = socks.socksocket
+    # Per-operation messages are logged at DEBUG; raise AD_LOG_LEVEL to INFO
+    # to keep the output down to the final search result
+    logging.basicConfig(level=os.getenv('AD_LOG_LEVEL', 'DEBUG'),
+                        format='%(asctime)s %(levelname)s %(name)s %(message)s')
 
-    ad = ActiveDirectory()
+    # The script connects directly; if the AD host is only reachable through
+    # a SOCKS5 proxy, run it under an OS-level userland such as proxychains
+    # (or an ssh -D tunnel) instead of patching the socket layer in Python.
+    ad = get_ad()
 
     # Ensure Organizational Units exist
     ad.ensure_ou_exists("Groups")
     ad.ensure_ou_exists("Users")
 
     # Delete existing users & groups
-    ad.delete_object(f'CN=win_user,CN=Users,{ad.base_dn}', 'User')
-    ad.delete_object(f'CN=nfs_daemon,CN=Users,{ad.base_dn}', 'User')
-    ad.delete_object(f'CN=win_users,OU=Groups,{ad.base_dn}', 'Group')
-    ad.delete_object(f'CN=nfs_daemons,OU=Groups,{ad.base_dn}', 'Group')
+    ad.delete_objects([
+        (ad.user_dn('win_user'), 'User'),
+        (ad.user_dn('nfs_daemon'), 'User'),
+        (ad.group_dn('win_users'), 'Group'),
+        (ad.group_dn('nfs_daemons'), 'Group'),
+    ])
 
     # Create groups
-    ad.create_group('win_users', 9060, 'Windows Users')
-    ad.create_group('nfs_daemons', 9050, 'NFS Daemons')
+    ad.create_groups([
+        ('win_users', 9060, 'Windows Users'),
+        ('nfs_daemons', 9050, 'NFS Daemons'),
+    ])
 
     # Create users
-    ad.create_user('win_user', 9060, 'Windows User')
-    ad.create_user('nfs_daemon', 9050, 'NFS Daemon')
+    ad.create_users([
+        ('win_user', 9060, 'Windows User'),
+        ('nfs_daemon', 9050, 'NFS Daemon'),
+    ])
 
     # Assign users to groups
     ad.add_user_to_group('win_users', 'win_user')
@@ -35,7 +56,7 @@ if __name__ == "__main__":
     # Search for a specific user
     specific_user = ad.search_objects(object_class="user", search_filter="(cn=win_user)",
                                       attributes=["cn", "sAMAccountName", "mail", "gidNumber", "PrimaryGroupID"])
-    print("Specific User:", specific_user)
+    logger.info("Specific User: %s", specific_user)
 
     # Close the connection
     ad.close()
\ No newline at end of file
@@ -1,40 +1,55 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 from flash_array import FlashArray
 
 def setup(fa):
 
-    # Create filesystem
+    # Create filesystem first; both protocol chains export its root directory
     fa.create_file_system('multi_protocol_file_system')
 
-    # Create and add NFS export policy
-    fa.create_policy_nfs(name='nfs_multi_protocol_access_policy', disable_user_mapping=False)
-    fa.create_policy_nfs_rule(policy_name='nfs_multi_protocol_access_policy', client='*', access='all-squash',
-                              anonuid='9050', anongid='9050', nfs_version='nfsv4', security='auth_sys',
-                              permission='rw')
-
-    fa.export_managed_directory_nfs(policy_name='nfs_multi_protocol_access_policy',
-                                    managed_directory_name='multi_protocol_file_system:root',
-                                    export_name='multi')
-
-    fa.create_policy_smb(name='smb_multi_protocol_access_policy')
-    fa.create_policy_smb_rule(policy_name='smb_multi_protocol_access_policy', client='*')
-    fa.export_managed_directory_smb(policy_name='smb_multi_protocol_access_policy',
-                                    managed_directory_name='multi_protocol_file_system:root',
-                                    export_name='multi')
+    def setup_nfs():
+        # Create and add NFS export policy
+        fa.create_policy_nfs(name='nfs_multi_protocol_access_policy', disable_user_mapping=False)
+        fa.create_policy_nfs_rule(policy_name='nfs_multi_protocol_access_policy', client='*', access='all-squash',
+                                  anonuid='9050', anongid='9050', nfs_version='nfsv4', security='auth_sys',
+                                  permission='rw')
+
+        fa.export_managed_directory_nfs(policy_name='nfs_multi_protocol_access_policy',
+                                        managed_directory_name='multi_protocol_file_system:root',
+                                        export_name='multi')
+
+    def setup_smb():
+        fa.create_policy_smb(name='smb_multi_protocol_access_policy')
+        fa.create_policy_smb_rule(policy_name='smb_multi_protocol_access_policy', client='*')
+        fa.export_managed_directory_smb(policy_name='smb_multi_protocol_access_policy',
+                                        managed_directory_name='multi_protocol_file_system:root',
+                                        export_name='multi')
+
+    # The NFS and SMB chains are independent of each other; run them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for future in [executor.submit(setup_nfs), executor.submit(setup_smb)]:
+            future.result()
 
 def cleanup(fa):
 
     # Delete exports and policies
-    fa.delete_export(export_name='multi', policy_name='nfs_multi_protocol_access_policy')
-    fa.delete_export(export_name='multi', policy_name='smb_multi_protocol_access_policy')
-
-    # Delete file system
-    fa.destroy_file_system(name='multi_protocol_file_system')
-    fa.eradicate_file_system(name='multi_protocol_file_system')
-
-    fa.delete_policy_nfs(name='nfs_multi_protocol_access_policy')
-    fa.delete_policy_smb(name='smb_multi_protocol_access_policy')
+    fa.delete_exports(export_names=['multi'],
+                      policy_names=['nfs_multi_protocol_access_policy', 'smb_multi_protocol_access_policy'])
+
+    def cleanup_file_system():
+        # Delete file system
+        fa.destroy_file_system(name='multi_protocol_file_system')
+        fa.eradicate_file_system(name='multi_protocol_file_system')
+
+    def cleanup_policies():
+        fa.delete_policy_nfs(name='nfs_multi_protocol_access_policy')
+        fa.delete_policy_smb(name='smb_multi_protocol_access_policy')
+
+    # Once the exports are gone, the file system and the policies can be removed concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for future in [executor.submit(cleanup_file_system), executor.submit(cleanup_policies)]:
+            future.result()
 
 
 # Setup connection to FlashArray